@@ -1,16 +1,26 @@
+import csv
 import logging
+from itertools import groupby
+from operator import itemgetter
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models.orders import Order
 from models.barcodes import Barcode
-from sqlalchemy import func, desc
+from sqlalchemy import bindparam, func, desc, insert, lambda_stmt, select
+from sqlalchemy.dialects import postgresql, sqlite
 # from sqlite3 import OperationalError
 from sqlalchemy.exc import OperationalError
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+BATCH_SIZE = 10_000
 
-def create_order(db: Session, order_id: str, customer_id: str):
+# Lookup statements are built once so their compiled SQL is cached for the life of the process.
+ORDER_BY_ID = lambda_stmt(lambda: select(Order).where(Order.id == bindparam('id')))
+BARCODE_BY_CODE = lambda_stmt(lambda: select(Barcode).where(Barcode.code == bindparam('code')))
+
+
+def create_order(db: Session, order_id: int, customer_id: str):
     """
     Creates an order in the database.
 
@@ -20,12 +30,11 @@ def create_order(db: Session, order_id: str, customer_id: str):
     :return: Created Order object.
     """
     try:
-        existing_order = db.query(Order).filter(Order.id == order_id).first()
+        existing_order = get_order_by_id(db, order_id)
         if existing_order is None:
             db_order = Order(id=order_id, customer_id=customer_id)
             db.add(db_order)
             db.commit()
-            db.refresh(db_order)
             return db_order
         else:
             logging.info(f"Order {order_id} already exists. Skipping.")
@@ -37,7 +46,7 @@ def create_order(db: Session, order_id: str, customer_id: str):
         logging.error(f"Unexpected error: {e}")
 
 
-def create_barcode(db: Session, barcode: str, order_id: str = None):
+def create_barcode(db: Session, barcode: str, order_id: int = None):
     """
     Creates a barcode in the database.
 
@@ -47,15 +56,11 @@ def create_barcode(db: Session, barcode: str, order_id: str = None):
     :return: Created Barcode object.
     """
     try:
-        if order_id == '':
-            order_id = None  # Treat empty strings as None
-
-        existing_barcode = db.query(Barcode).filter(Barcode.code == barcode).first()
+        existing_barcode = get_barcode(db, barcode)
         if existing_barcode is None:
             db_barcode = Barcode(code=barcode, order_id=order_id)
             db.add(db_barcode)
             db.commit()
-            db.refresh(db_barcode)
             return db_barcode
         else:
             logging.info(f"Barcode {barcode} already exists. Skipping.")
@@ -67,6 +72,205 @@ def create_barcode(db: Session, barcode: str, order_id: str = None):
         logging.error(f"Unexpected error: {e}")
 
 
+def _insert_ignore(db: Session, table):
+    """
+    Builds an INSERT statement that silently skips rows violating a unique key,
+    on dialects that support it (SQLite, PostgreSQL, MySQL/MariaDB).
+
+    :param db: Database session.
+    :param table: Table to insert into.
+    :return: Insert statement for the session's dialect.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(table).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect in ('mysql', 'mariadb'):
+        return insert(table).prefix_with('IGNORE')
+    # No portable conflict clause; callers filter duplicates with skip_existing first.
+    return insert(table)
+
+
+def _execute_batched(db: Session, stmt, rows, batch_size: int):
+    """
+    Executes a statement as executemany over chunks of rows.
+
+    :param db: Database session.
+    :param stmt: Statement to execute.
+    :param rows: Iterable of parameter dictionaries.
+    :param batch_size: Maximum number of rows sent per executemany call.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(stmt, batch)
+            batch = []
+    if batch:
+        db.execute(stmt, batch)
+
+
+def bulk_insert_orders(db: Session, rows, batch_size: int = BATCH_SIZE):
+    """
+    Inserts orders in batches, skipping ids that already exist where the dialect
+    supports it (see _insert_ignore). Does not commit.
+
+    :param db: Database session.
+    :param rows: Iterable of dictionaries with 'id' and 'customer_id' keys.
+    :param batch_size: Maximum number of rows sent per executemany call.
+    """
+    _execute_batched(db, _insert_ignore(db, Order.__table__), rows, batch_size)
+
+
+def bulk_insert_barcodes(db: Session, rows, batch_size: int = BATCH_SIZE):
+    """
+    Inserts barcodes in batches, skipping codes that already exist where the dialect
+    supports it (see _insert_ignore). Does not commit.
+
+    :param db: Database session.
+    :param rows: Iterable of dictionaries with 'code' and 'order_id' keys.
+    :param batch_size: Maximum number of rows sent per executemany call.
+    """
+    _execute_batched(db, _insert_ignore(db, Barcode.__table__), rows, batch_size)
+
+
+def copy_statements(dialect, table, header: list, column_map: dict):
+    """
+    Builds the PostgreSQL statements that load a CSV file through a staging table.
+
+    COPY has no conflict handling, so the file is copied as text into a temporary
+    table with the file's own columns, then inserted into the target table with
+    ON CONFLICT DO NOTHING. As on SQLite, empty values load as NULL and rows with
+    an empty required column are skipped. CSV columns missing from column_map are
+    ignored.
+
+    :param dialect: SQLAlchemy dialect used to quote identifiers and render types.
+    :param table: Table to load into.
+    :param header: Column names from the CSV header line.
+    :param column_map: Mapping of CSV column names to table column names.
+    :return: Tuple of (CREATE TEMP TABLE, COPY, INSERT ... SELECT) statements.
+    """
+    quote = dialect.identifier_preparer.quote
+    staging = quote(f"{table.name}_staging")
+    mapped = [name for name in header if name in column_map]
+    create = (
+        f"CREATE TEMP TABLE {staging} ({', '.join(f'{quote(name)} text' for name in header)}) ON COMMIT DROP"
+    )
+    copy = f"COPY {staging} FROM STDIN WITH (FORMAT csv, HEADER true)"
+    columns = ', '.join(quote(column_map[name]) for name in mapped)
+    values = ', '.join(
+        f"CAST(NULLIF({quote(name)}, '') AS {table.c[column_map[name]].type.compile(dialect=dialect)})"
+        for name in mapped
+    )
+    required = [f"NULLIF({quote(name)}, '') IS NOT NULL" for name in mapped if not table.c[column_map[name]].nullable]
+    where = f" WHERE {' AND '.join(required)}" if required else ''
+    insert_rows = (
+        f"INSERT INTO {quote(table.name)} ({columns}) SELECT {values} FROM {staging}{where} ON CONFLICT DO NOTHING"
+    )
+    return create, copy, insert_rows
+
+
+def copy_from_file(cursor, copy: str, file, block_size: int = 1 << 20):
+    """
+    Streams a file into a COPY ... FROM STDIN statement on a PostgreSQL cursor.
+
+    Supports psycopg2 (cursor.copy_expert) and psycopg 3 (cursor.copy).
+
+    :param cursor: DB-API cursor of the PostgreSQL driver.
+    :param copy: COPY ... FROM STDIN statement.
+    :param file: Open text file positioned at the data to copy.
+    :param block_size: Characters sent to the server per write with psycopg 3.
+    """
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(copy, file)
+        return
+    with cursor.copy(copy) as stream:
+        for block in iter(lambda: file.read(block_size), ''):
+            stream.write(block)
+
+
+def bulk_load_csv(db: Session, file_path: str, table, column_map: dict):
+    """
+    Loads a CSV file into a table through the database driver's native bulk path,
+    without any validation. Does not commit.
+
+    Rows whose key already exists are skipped where the dialect supports it (see
+    _insert_ignore), and CSV columns missing from column_map are ignored. PostgreSQL streams the file with COPY into a staging
+    table (see copy_statements) when the driver has a COPY API (psycopg2 or
+    psycopg 3). SQLite uses INSERT OR IGNORE via the driver's executemany, so rows
+    with empty required columns are skipped as well. Other databases and drivers
+    fall back to the batched Core insert.
+
+    Raises ValueError, before anything is inserted, if the header lacks a column
+    mapped to a NOT NULL table column.
+
+    :param db: Database session.
+    :param file_path: Path to the CSV file, including a header line.
+    :param table: Table to load into.
+    :param column_map: Mapping of CSV column names to table column names.
+    """
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        positions = [position for position, name in enumerate(header) if name in column_map]
+        columns = [column_map[header[position]] for position in positions]
+        # Without these columns every row would be dropped, leaving the table silently empty.
+        missing = [
+            name for name, column in column_map.items() if not table.c[column].nullable and column not in columns
+        ]
+        if missing:
+            raise ValueError(f"{file_path} is missing required columns: {', '.join(missing)}")
+
+        def mapped_values(row):
+            return [(row[position] or None) if position < len(row) else None for position in positions]
+
+        dialect = db.get_bind().dialect
+        dbapi_connection = db.connection().connection
+        if dialect.name == 'postgresql':
+            create, copy, insert_rows = copy_statements(dialect, table, header, column_map)
+            cursor = dbapi_connection.cursor()
+            if hasattr(cursor, 'copy_expert') or hasattr(cursor, 'copy'):
+                cursor.execute(create)
+                file.seek(0)
+                copy_from_file(cursor, copy, file)
+                cursor.execute(insert_rows)
+                cursor.close()
+                return
+            # Drivers without a COPY API use the batched insert below.
+            cursor.close()
+
+        if dialect.name == 'sqlite':
+            placeholders = ', '.join('?' for _ in columns)
+            cursor = dbapi_connection.cursor()
+            cursor.executemany(
+                f"INSERT OR IGNORE INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})",
+                (mapped_values(row) for row in reader),
+            )
+            cursor.close()
+        else:
+            rows = (dict(zip(columns, mapped_values(row))) for row in reader)
+            _execute_batched(db, _insert_ignore(db, table), rows, BATCH_SIZE)
+
+
+def iter_barcode_groups(db: Session, yield_per: int = 1000):
+    """
+    Streams barcodes grouped by customer and order, ordered by customer and order.
+
+    :param db: Database session.
+    :param yield_per: Number of rows fetched from the cursor at a time.
+    :return: Generator of (customer_id, order_id, list of barcode codes) tuples.
+    """
+    stmt = (
+        select(Order.customer_id, Order.id, Barcode.code)
+        .join(Barcode, Barcode.order_id == Order.id)
+        .order_by(Order.customer_id, Order.id, Barcode.id)
+        .execution_options(yield_per=yield_per)
+    )
+    for (customer_id, order_id), rows in groupby(db.execute(stmt), key=itemgetter(0, 1)):
+        yield customer_id, order_id, [code for _, _, code in rows]
+
+
 def list_barcodes(db: Session):
     """
     Lists all barcodes grouped by customer and order.
@@ -75,16 +279,9 @@ def list_barcodes(db: Session):
     :return: Dictionary of barcodes grouped by customer and order.
     """
     try:
-        barcodes = db.query(Barcode).join(Order, Barcode.order_id == Order.id).all()
-
-        grouped_barcodes = {}
-        for barcode in barcodes:
-            key = (barcode.order.customer_id, barcode.order.id)
-            if key not in grouped_barcodes:
-                grouped_barcodes[key] = []
-            grouped_barcodes[key].append(barcode.code)
-
-        return grouped_barcodes
+        return {
+            (customer_id, order_id): codes for customer_id, order_id, codes in iter_barcode_groups(db)
+        }
     except OperationalError as e:
         if "no such table: barcodes" in str(e):
             logging.error("The table 'barcodes' does not exist in the database. use --load-data <csv-files>")
@@ -130,7 +327,7 @@ def count_unused_barcodes(db: Session):
     :return: Count of unused barcodes.
     """
     try:
-        return db.query(Barcode).filter(Barcode.order_id == None).count()
+        return db.execute(select(func.count()).select_from(Barcode).where(Barcode.order_id.is_(None))).scalar_one()
     except OperationalError as e:
         logging.error(f"Operational error in database operation: {e}, Load the data first in the database."
                       f"Use --load-data <csv-files>")
@@ -140,18 +337,18 @@ def count_unused_barcodes(db: Session):
 
 
 
-def get_order_by_id(db: Session, order_id: str):
+def get_order_by_id(db: Session, order_id: int):
     """
     Retrieve an order by its ID.
 
     Args:
         db (Session): SQLAlchemy database session.
-        order_id (str): The ID of the order to retrieve.
+        order_id (int): The ID of the order to retrieve.
 
     Returns:
         Order: The retrieved order or None if not found.
     """
-    return db.query(Order).filter(Order.id == order_id).first()
+    return db.execute(ORDER_BY_ID, {'id': order_id}).scalar_one_or_none()
 
 
 def get_barcode(db: Session, barcode_code: str):
@@ -165,7 +362,33 @@ def get_barcode(db: Session, barcode_code: str):
     Returns:
         Barcode: The retrieved barcode or None if not found.
     """
-    return db.query(Barcode).filter(Barcode.code == barcode_code).first()
+    return db.execute(BARCODE_BY_CODE, {'code': barcode_code}).scalar_one_or_none()
+
+
+def get_order_ids(db: Session):
+    """
+    Retrieve the IDs of all stored orders in a single query.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        set: IDs of all orders.
+    """
+    return set(db.execute(select(Order.id)).scalars())
+
+
+def get_barcode_codes(db: Session):
+    """
+    Retrieve the codes of all stored barcodes in a single query.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        set: Codes of all barcodes.
+    """
+    return set(db.execute(select(Barcode.code)).scalars())
 
 
 def delete_all_data(db: Session):
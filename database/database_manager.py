@@ -1,14 +1,62 @@
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # DATABASE_URL = "sqlite:///./tiqets.db"
 # database_url = os.getenv("DATABASE_URL", "sqlite:///./tiqets.db")
 database_url = os.getenv("DATABASE_URL")
 
-engine = create_engine(database_url)
+
+def engine_options(url):
+    """
+    Build create_engine keyword arguments for a database URL.
+
+    SQLite connections may be shared across threads, and in-memory databases use a
+    single static connection so every session sees the same data. Other databases
+    get a larger connection pool than the default.
+
+    Args:
+        url (str): Database URL.
+
+    Returns:
+        dict: Keyword arguments for create_engine.
+    """
+    url = make_url(url)
+    options = {'query_cache_size': 1200, 'pool_pre_ping': True}
+    if url.get_backend_name() == 'sqlite':
+        options['connect_args'] = {'check_same_thread': False}
+        if url.database in (None, '', ':memory:'):
+            options['poolclass'] = StaticPool
+            return options
+    options.update(pool_size=20, max_overflow=40)
+    return options
+
+
+engine = create_engine(database_url, **engine_options(database_url))
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-200000",
+)
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL with synchronous=NORMAL only fsyncs at checkpoints instead of on every commit.
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+if engine.dialect.name == 'sqlite':
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -16,3 +64,7 @@ Base = declarative_base()
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes introduced after a database was first created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
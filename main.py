@@ -1,46 +1,172 @@
 import argparse
-import csv
 import logging
 import os
 import sys
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from sqlite3 import OperationalError
 
-from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from database.crud import create_order, create_barcode, get_barcode
+from database.crud import bulk_insert_orders, bulk_insert_barcodes
 from database.database_manager import SessionLocal, init_db
-from utils.validation import OrderModel, BarcodeModel
-from models.orders import Order
+from utils import csv_reader
+from utils.validation import OrderModel, BarcodeModel, invalid_row_indices, split_rows, split_valid_batch, \
+    split_valid_rows
 from database import crud
+from models.barcodes import Barcode
+from models.orders import Order
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def read_and_validate_data(file_path, model, db: Session):
+def report_invalid_row(row):
+    """
+    Report a CSV row with the wrong number of fields and tell pyarrow to skip it.
+
+    Args:
+        row (pyarrow.csv.InvalidRow): The malformed row.
+
+    Returns:
+        str: 'skip'.
+    """
+    print(f"Invalid data: {row.text}", file=sys.stderr)
+    return 'skip'
+
+
+@contextmanager
+def validation_pool(workers):
+    """
+    Start a process pool for row validation, shared by every file of a load.
+
+    Args:
+        workers (int): Number of validation processes.
+
+    Yields:
+        ProcessPoolExecutor: The pool, or None when workers is 1 or less or pyarrow's
+            vectorized validation will be used instead.
+    """
+    if workers <= 1 or csv_reader.pa_csv is not None:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield executor
+
+
+def iter_validated_batches(file_path, model, executor=None, max_pending=2):
+    """
+    Read a CSV file in batches and validate each batch.
+
+    With pyarrow installed, batches are validated in this process with vectorized
+    column checks, which is cheaper than shipping them to other processes. Otherwise
+    each row is validated with the Pydantic model; given an executor, batches are
+    validated in its worker processes while the file is still being read. Workers
+    only send back the positions of invalid rows, at most max_pending batches are
+    in flight so memory stays bounded, and results are yielded in file order.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        model (pydantic.BaseModel): The Pydantic model for data validation.
+        executor (ProcessPoolExecutor, optional): Pool for per-row validation.
+        max_pending (int, optional): Batches submitted to the pool and not yet yielded.
+
+    Yields:
+        tuple: (valid rows, invalid rows) for each batch.
+    """
+    if csv_reader.pa_csv is not None:
+        for batch in csv_reader.iter_record_batches(file_path, invalid_row_handler=report_invalid_row):
+            yield split_valid_batch(batch, model)
+        return
+
+    batches = csv_reader.iter_csv_batches(file_path)
+    if executor is None:
+        for batch in batches:
+            yield split_valid_rows(batch, model)
+        return
+
+    pending = deque()
+    for batch in batches:
+        pending.append((batch, executor.submit(invalid_row_indices, batch, model)))
+        if len(pending) >= max_pending:
+            batch, invalid = pending.popleft()
+            yield split_rows(batch, invalid.result())
+    while pending:
+        batch, invalid = pending.popleft()
+        yield split_rows(batch, invalid.result())
+
+
+def read_and_validate_data(file_path, model, executor=None, max_pending=2):
     """
     Read and validate data from a CSV file.
 
     Args:
         file_path (str): Path to the CSV file.
         model (pydantic.BaseModel): The Pydantic model for data validation.
-        db (Session): SQLAlchemy database session.
+        executor (ProcessPoolExecutor, optional): Pool for per-row validation.
+        max_pending (int, optional): Batches submitted to the pool and not yet yielded.
 
     Yields:
         dict: Valid rows from the CSV file.
     """
-    with open(file_path, 'r') as file:
-        data = list(csv.DictReader(file))
-        for row in data:
-            try:
-                model(**row)
-                if model == BarcodeModel and get_barcode(db, row['barcode']):
-                    logging.error(f"Barcode {row['barcode']} already exists, skipping!")
-                    continue
-                yield row
-            except ValidationError as e:
-                print(f"Invalid data: {row}", file=sys.stderr)
+    for valid_rows, invalid_rows in iter_validated_batches(file_path, model, executor, max_pending):
+        for row in invalid_rows:
+            print(f"Invalid data: {row}", file=sys.stderr)
+        yield from valid_rows
+
+
+ORDER_COLUMNS = {'order_id': 'id', 'customer_id': 'customer_id'}
+BARCODE_COLUMNS = {'barcode': 'code', 'order_id': 'order_id'}
+
+
+def order_rows(rows):
+    """
+    Map validated order CSV rows to `orders` table columns.
+
+    Args:
+        rows (iterable): Validated rows from the orders CSV file.
+
+    Yields:
+        dict: Column values for an order.
+    """
+    for row in rows:
+        yield {'id': int(row['order_id']), 'customer_id': row['customer_id']}
+
+
+def barcode_rows(rows):
+    """
+    Map validated barcode CSV rows to `barcodes` table columns.
+
+    Args:
+        rows (iterable): Validated rows from the barcodes CSV file.
+
+    Yields:
+        dict: Column values for a barcode. Empty order ids become None.
+    """
+    for row in rows:
+        yield {'code': row['barcode'], 'order_id': int(row['order_id']) if row['order_id'] else None}
+
+
+def skip_existing(rows, key, existing, label):
+    """
+    Drop rows whose key is already known, remembering keys as they pass through.
+
+    Args:
+        rows (iterable): Column values for rows read from a CSV file.
+        key (str): Column holding the unique key.
+        existing (set): Keys already stored; updated in place.
+        label (str): Entity name used in log messages.
+
+    Yields:
+        dict: Rows with a key not seen before.
+    """
+    for row in rows:
+        if row[key] in existing:
+            logging.info(f"{label} {row[key]} already exists, skipping!")
+            continue
+        existing.add(row[key])
+        yield row
 
 
 def determine_file_order(file_paths):
@@ -51,22 +177,25 @@ def determine_file_order(file_paths):
         file_paths (list): List of file paths.
 
     Returns:
-        list: Ordered list of file paths.
+        list: Ordered list of file paths, orders file first.
     """
-    with open(file_paths[0], 'r') as file:
-        if 'customer_id' in file.readline():
-            return file_paths
-        else:
-            return file_paths[::-1]
+    if 'customer_id' in csv_reader.read_header(file_paths[0]):
+        return file_paths
+    else:
+        return file_paths[::-1]
 
 
-def load_data(file_paths, db: Session):
+def load_data(file_paths, db: Session, validate=True, workers=1):
     """
     Load data from CSV files into the database. Overwrites all previous data.
 
     Args:
         file_paths (list): List of file paths.
         db (Session): SQLAlchemy database session.
+        validate (bool, optional): Validate rows before inserting them. When False the
+            files are handed to the database's native bulk loader. Default is True.
+        workers (int, optional): Number of processes validating CSV rows when pyarrow is
+            not installed. Default is 1.
     """
     for file_path in file_paths:
         if not os.path.exists(file_path):
@@ -78,11 +207,16 @@ def load_data(file_paths, db: Session):
         crud.delete_all_data(db)
         orders_file, barcodes_file = determine_file_order(file_paths)
 
-        for row in read_and_validate_data(orders_file, OrderModel, db):
-            create_order(db, row['order_id'], row['customer_id'])
-
-        for row in read_and_validate_data(barcodes_file, BarcodeModel, db):
-            create_barcode(db, row['barcode'], row['order_id'])
+        if validate:
+            with validation_pool(workers) as executor:
+                # The tables were just emptied, so only duplicates within the files are skipped.
+                orders = order_rows(read_and_validate_data(orders_file, OrderModel, executor, 2 * workers))
+                bulk_insert_orders(db, skip_existing(orders, 'id', set(), "Order"))
+                barcodes = barcode_rows(read_and_validate_data(barcodes_file, BarcodeModel, executor, 2 * workers))
+                bulk_insert_barcodes(db, skip_existing(barcodes, 'code', set(), "Barcode"))
+        else:
+            crud.bulk_load_csv(db, orders_file, Order.__table__, ORDER_COLUMNS)
+            crud.bulk_load_csv(db, barcodes_file, Barcode.__table__, BARCODE_COLUMNS)
 
         db.commit()
         logging.info("Data loaded successfully.")
@@ -93,13 +227,15 @@ def load_data(file_paths, db: Session):
         db.close()
 
 
-def append_data(file_paths, db: Session):
+def append_data(file_paths, db: Session, workers=1):
     """
     Append data from CSV files into the database.
 
     Args:
         file_paths (list): List of file paths.
         db (Session): SQLAlchemy database session.
+        workers (int, optional): Number of processes validating CSV rows when pyarrow is
+            not installed. Default is 1.
     """
     for file_path in file_paths:
         if not os.path.exists(file_path):
@@ -107,14 +243,15 @@ def append_data(file_paths, db: Session):
 
     try:
         orders_file, barcodes_file = determine_file_order(file_paths)
+        existing_order_ids = crud.get_order_ids(db)
+        existing_codes = crud.get_barcode_codes(db)
 
-        for row in read_and_validate_data(orders_file, OrderModel, db):
-            if not db.query(Order).filter(Order.id == row['order_id']).first():
-                create_order(db, row['order_id'], row['customer_id'])
+        with validation_pool(workers) as executor:
+            orders = order_rows(read_and_validate_data(orders_file, OrderModel, executor, 2 * workers))
+            bulk_insert_orders(db, skip_existing(orders, 'id', existing_order_ids, "Order"))
 
-        for row in read_and_validate_data(barcodes_file, BarcodeModel, db):
-            if not get_barcode(db, row['barcode']):
-                create_barcode(db, row['barcode'], row['order_id'])
+            barcodes = barcode_rows(read_and_validate_data(barcodes_file, BarcodeModel, executor, 2 * workers))
+            bulk_insert_barcodes(db, skip_existing(barcodes, 'code', existing_codes, "Barcode"))
 
         db.commit()
         logging.info("Data appended successfully.")
@@ -133,8 +270,7 @@ def list_barcodes(db: Session):
         db (Session): SQLAlchemy database session.
     """
     try:
-        grouped_barcodes = crud.list_barcodes(db)
-        for (customer_id, order_id), barcodes in grouped_barcodes.items():
+        for customer_id, order_id, barcodes in crud.iter_barcode_groups(db):
             print(f"Customer: {customer_id}, Order: {order_id}, Barcodes: {barcodes}")
 
         logging.info("Barcodes grouped and listed successfully.")
@@ -178,8 +314,13 @@ def count_unused_barcodes(db: Session):
 def main():
     parser = argparse.ArgumentParser(description="Data Management for Tiqets.")
     parser.add_argument("--load-data", nargs=2, help="Load data from CSV files. Over writes all previous data")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="With --load-data, skip row validation and use the database's native bulk loader.")
     parser.add_argument("--append-data", nargs=2, help="Append data from CSV files. "
                                                        "Appends new rows, and skips existing ones")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes validating CSV rows with --load-data/--append-data "
+                             "when pyarrow is not installed. Default is 1.")
     parser.add_argument("--barcodes", action="store_true", help="List all barcodes and related data.")
     parser.add_argument("--top-customers", nargs='?', const=5, type=int,
                         help="List top N customers by number of tickets purchased. Default is 5.")
@@ -190,9 +331,9 @@ def main():
     db = SessionLocal()
     try:
         if args.load_data:
-            load_data(args.load_data, db)
+            load_data(args.load_data, db, validate=not args.no_validate, workers=args.workers)
         elif args.append_data:
-            append_data(args.append_data, db)
+            append_data(args.append_data, db, workers=args.workers)
         elif args.barcodes:
             list_barcodes(db)
         elif args.top_customers:
@@ -8,7 +8,7 @@ class Barcode(Base):
 
     id = Column(Integer, primary_key=True)
     code = Column(String, nullable=False, unique=True)
-    order_id = Column(Integer, ForeignKey('orders.id'))
+    order_id = Column(Integer, ForeignKey('orders.id'), index=True)
     order = relationship("Order", back_populates="barcodes")
 
     def __repr__(self):
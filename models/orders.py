@@ -6,7 +6,7 @@ class Order(Base):
     __tablename__ = 'orders'
 
     id = Column(Integer, primary_key=True)
-    customer_id = Column(String, nullable=False)
+    customer_id = Column(String, nullable=False, index=True)
     barcodes = relationship("Barcode", back_populates="order")
 
     def __repr__(self):
@@ -1,17 +1,24 @@
+import logging
 import sys
 import os
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import mssql, mysql, postgresql, sqlite
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from contextlib import redirect_stdout
 import io
+from types import SimpleNamespace
 
 from sqlalchemy_orm.session import Session
 
 from database import crud
 
-from database.database_manager import Base
-from main import load_data, append_data, list_barcodes, count_unused_barcodes
+from database.database_manager import Base, engine_options
+from main import load_data, append_data, list_barcodes, count_unused_barcodes, determine_file_order, \
+    read_and_validate_data, validation_pool
+from utils import csv_reader
+from utils.validation import BarcodeModel, OrderModel
 from models.orders import Order
 from models.barcodes import Barcode
 
@@ -20,7 +27,7 @@ from models.barcodes import Barcode
 def test_db():
     test_database_url = os.getenv("TEST_DATABASE_URL", "sqlite:///./tests/test_tiqets.db")
 
-    engine = create_engine(test_database_url)
+    engine = create_engine(test_database_url, **engine_options(test_database_url))
     Base.metadata.create_all(engine)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     session = SessionLocal()
@@ -63,6 +70,7 @@ def test_list_barcodes(test_db):
     output = f.getvalue()
 
     assert "Customer: 100, Order: 1, Barcodes:" in output
+    assert "'11111'" in output and "'22222'" in output
 
 
 def test_count_unused_barcodes(test_db):
@@ -165,3 +173,269 @@ def test_delete_all_data(test_db: Session):
     barcodes = test_db.query(Barcode).all()
     assert len(orders) == 0
     assert len(barcodes) == 0
+
+
+def test_bulk_insert_orders(test_db: Session):
+    rows = [{'id': 2000, 'customer_id': '600'}, {'id': 2001, 'customer_id': '601'}]
+    crud.bulk_insert_orders(test_db, rows, batch_size=1)
+    crud.bulk_insert_orders(test_db, rows)  # existing ids are skipped
+    test_db.commit()
+
+    assert test_db.query(Order).filter(Order.id.in_([2000, 2001])).count() == 2
+
+    test_db.query(Order).filter(Order.id.in_([2000, 2001])).delete()
+    test_db.commit()
+
+
+def test_bulk_insert_barcodes(test_db: Session):
+    rows = [{'code': 'bulk1', 'order_id': None}, {'code': 'bulk2', 'order_id': 1}]
+    crud.bulk_insert_barcodes(test_db, rows, batch_size=1)
+    crud.bulk_insert_barcodes(test_db, rows)  # existing codes are skipped
+    test_db.commit()
+
+    assert test_db.query(Barcode).filter(Barcode.code.in_(['bulk1', 'bulk2'])).count() == 2
+
+    test_db.query(Barcode).filter(Barcode.code.in_(['bulk1', 'bulk2'])).delete()
+    test_db.commit()
+
+
+def test_get_order_ids_and_barcode_codes(test_db: Session):
+    load_data(['tests/mock_orders.csv', 'tests/mock_barcodes.csv'], test_db)
+
+    assert crud.get_order_ids(test_db) == {1, 2, 3, 4, 5}
+    assert "11111" in crud.get_barcode_codes(test_db)
+    assert len(crud.get_barcode_codes(test_db)) == 9
+
+
+def test_indexes_created(test_db: Session):
+    inspector = inspect(test_db.get_bind())
+    barcode_indexes = {index['name'] for index in inspector.get_indexes('barcodes')}
+    order_indexes = {index['name'] for index in inspector.get_indexes('orders')}
+
+    assert 'ix_barcodes_order_id' in barcode_indexes
+    assert 'ix_orders_customer_id' in order_indexes
+
+
+def test_iter_csv_batches_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(csv_reader, 'pa_csv', None)
+    batches = list(csv_reader.iter_csv_batches('tests/mock_barcodes.csv', batch_size=4))
+
+    assert [len(batch) for batch in batches] == [4, 4, 1]
+    assert batches[0][0] == {'barcode': '11111', 'order_id': '1'}
+    assert batches[1][1] == {'barcode': '66666', 'order_id': ''}
+
+
+def test_iter_csv_batches_with_pyarrow():
+    pytest.importorskip('pyarrow')
+    rows = [row for batch in csv_reader.iter_csv_batches('tests/mock_barcodes.csv') for row in batch]
+
+    assert len(rows) == 9
+    assert rows[0] == {'barcode': '11111', 'order_id': '1'}
+    assert rows[5] == {'barcode': '66666', 'order_id': ''}
+
+
+def test_load_data_without_validation(test_db: Session):
+    crud.delete_all_data(test_db)
+    test_db.commit()
+
+    load_data(['tests/mock_barcodes.csv', 'tests/mock_orders.csv'], test_db, validate=False)
+
+    assert test_db.query(Order).count() == 5
+    assert test_db.query(Barcode).count() == 9
+    assert test_db.query(Barcode).filter(Barcode.order_id == None).count() == 1
+
+
+def test_determine_file_order(tmp_path):
+    orders_path = 'tests/mock_orders.csv'
+    barcodes_path = tmp_path / 'barcodes.csv'
+    barcodes_path.write_text('barcode,order_id,old_customer_id\n12345,1,100\n')
+
+    assert determine_file_order([orders_path, barcodes_path]) == [orders_path, barcodes_path]
+    assert determine_file_order([barcodes_path, orders_path]) == [orders_path, barcodes_path]
+
+
+def test_iter_barcode_groups(test_db: Session):
+    load_data(['tests/mock_orders.csv', 'tests/mock_barcodes.csv'], test_db)
+    groups = list(crud.iter_barcode_groups(test_db, yield_per=2))
+
+    assert [(customer_id, order_id) for customer_id, order_id, _ in groups] == [
+        ('100', 1), ('101', 2), ('102', 3), ('103', 4), ('104', 5)
+    ]
+    assert sorted(groups[0][2]) == ['11111', '22222']
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("use_pyarrow", [False, True])
+def test_read_and_validate_data(test_db: Session, tmp_path, monkeypatch, use_pyarrow, workers):
+    if use_pyarrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(csv_reader, 'pa_csv', None)
+    barcodes_path = tmp_path / 'barcodes.csv'
+    barcodes_path.write_text('barcode,order_id\n11111,1\n,2\n22222,\n33333\n44444,x\n55555,1.0\n'
+                             '66666,99999999999999999999\n77777,-9223372036854775808\n88888,9223372036854775808\n')
+    orders_path = tmp_path / 'orders.csv'
+    orders_path.write_text('order_id,customer_id\n1,100\n2,\nabc,103\n,104\n09223372036854775807,105\n'
+                           '2,11,extra\n')
+
+    with validation_pool(workers) as executor:
+        barcodes = list(read_and_validate_data(barcodes_path, BarcodeModel, executor))
+        orders = list(read_and_validate_data(orders_path, OrderModel, executor))
+
+    assert [row['barcode'] for row in barcodes] == ['11111', '22222', '77777']
+    assert orders == [
+        {'order_id': '1', 'customer_id': '100'},
+        {'order_id': '2', 'customer_id': ''},
+        {'order_id': '09223372036854775807', 'customer_id': '105'},
+    ]
+
+
+def test_engine_options():
+    assert engine_options("sqlite://")['poolclass'] is StaticPool
+    assert engine_options("sqlite:///./tiqets.db")['connect_args'] == {'check_same_thread': False}
+    assert engine_options("sqlite:///./tiqets.db")['pool_size'] == 20
+    assert 'connect_args' not in engine_options("postgresql://user@localhost/tiqets")
+
+
+def test_load_data_with_workers(test_db: Session, monkeypatch):
+    monkeypatch.setattr(csv_reader, 'iter_csv_batches',
+                        lambda file_path: csv_reader._iter_dict_reader_batches(file_path, batch_size=2))
+    monkeypatch.setattr(csv_reader, 'pa_csv', None)
+    crud.delete_all_data(test_db)
+    test_db.commit()
+
+    load_data(['tests/mock_orders.csv', 'tests/mock_barcodes.csv'], test_db, workers=2)
+
+    assert test_db.query(Order).count() == 5
+    assert test_db.query(Barcode).count() == 9
+
+
+def test_iter_barcode_groups_with_comma_in_code(test_db: Session):
+    crud.delete_all_data(test_db)
+    crud.bulk_insert_orders(test_db, [{'id': 1, 'customer_id': '100'}])
+    crud.bulk_insert_barcodes(test_db, [{'code': 'A,B', 'order_id': 1}, {'code': 'C', 'order_id': 1}])
+    test_db.commit()
+
+    assert list(crud.iter_barcode_groups(test_db)) == [('100', 1, ['A,B', 'C'])]
+    assert crud.list_barcodes(test_db) == {('100', 1): ['A,B', 'C']}
+
+
+@pytest.mark.parametrize("use_pyarrow", [False, True])
+def test_iter_csv_batches_bom_and_empty_file(tmp_path, monkeypatch, use_pyarrow):
+    if use_pyarrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(csv_reader, 'pa_csv', None)
+    bom_path = tmp_path / 'orders.csv'
+    bom_path.write_bytes('\ufefforder_id,customer_id\n1,100\nabc,101\n'.encode('utf-8'))
+    empty_path = tmp_path / 'empty.csv'
+    empty_path.write_text('')
+
+    rows = [row for batch in csv_reader.iter_csv_batches(bom_path) for row in batch]
+
+    assert csv_reader.read_header(bom_path) == ['order_id', 'customer_id']
+    assert rows == [{'order_id': '1', 'customer_id': '100'}, {'order_id': 'abc', 'customer_id': '101'}]
+    assert list(csv_reader.iter_csv_batches(empty_path)) == []
+
+
+def test_load_data_logs_duplicates_in_file(test_db: Session, tmp_path, caplog):
+    barcodes_path = tmp_path / 'barcodes.csv'
+    barcodes_path.write_text('barcode,order_id\n11111,1\n11111,2\n22222,\n')
+
+    with caplog.at_level(logging.INFO):
+        load_data(['tests/mock_orders.csv', barcodes_path], test_db)
+
+    assert "Barcode 11111 already exists, skipping!" in caplog.text
+    assert test_db.query(Barcode).count() == 2
+
+
+def test_bulk_load_csv_skips_unmapped_columns(test_db: Session, tmp_path):
+    orders_path = tmp_path / 'orders.csv'
+    orders_path.write_text('order_id,region,customer_id\n4000,eu,800\n4000,eu,801\n4001,us,802\n')
+
+    crud.bulk_load_csv(test_db, orders_path, Order.__table__, {'order_id': 'id', 'customer_id': 'customer_id'})
+    test_db.commit()
+
+    orders = test_db.query(Order).filter(Order.id.in_([4000, 4001])).order_by(Order.id).all()
+    assert [(order.id, order.customer_id) for order in orders] == [(4000, '800'), (4001, '802')]
+
+    test_db.query(Order).filter(Order.id.in_([4000, 4001])).delete()
+    test_db.commit()
+
+
+def test_copy_statements():
+    create, copy, insert_rows = crud.copy_statements(
+        postgresql.dialect(), Barcode.__table__, ['barcode', 'note', 'order_id'],
+        {'barcode': 'code', 'order_id': 'order_id'},
+    )
+
+    assert create == 'CREATE TEMP TABLE barcodes_staging (barcode text, note text, order_id text) ON COMMIT DROP'
+    assert copy == 'COPY barcodes_staging FROM STDIN WITH (FORMAT csv, HEADER true)'
+    assert insert_rows == (
+        "INSERT INTO barcodes (code, order_id) "
+        "SELECT CAST(NULLIF(barcode, '') AS VARCHAR), CAST(NULLIF(order_id, '') AS INTEGER) "
+        "FROM barcodes_staging WHERE NULLIF(barcode, '') IS NOT NULL ON CONFLICT DO NOTHING"
+    )
+
+
+def test_bulk_load_csv_rejects_missing_required_columns(test_db: Session, tmp_path):
+    load_data(['tests/mock_orders.csv', 'tests/mock_barcodes.csv'], test_db)
+    orders_path = tmp_path / 'orders.csv'
+    orders_path.write_text('7,107\n8,108\n')
+
+    with pytest.raises(ValueError):
+        crud.bulk_load_csv(test_db, orders_path, Order.__table__, {'order_id': 'id', 'customer_id': 'customer_id'})
+    test_db.rollback()
+
+    load_data([orders_path, 'tests/mock_barcodes.csv'], test_db, validate=False)
+
+    assert test_db.query(Order).count() == 5
+    assert test_db.query(Barcode).count() == 9
+
+
+@pytest.mark.parametrize("cursor_api", ['copy_expert', 'copy'])
+def test_copy_from_file(tmp_path, cursor_api):
+    copied = []
+
+    class Stream:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def write(self, block):
+            copied.append(block)
+
+    class Psycopg2Cursor:
+        def copy_expert(self, sql, file):
+            copied.append(file.read())
+
+    class Psycopg3Cursor:
+        def copy(self, sql):
+            return Stream()
+
+    path = tmp_path / 'orders.csv'
+    path.write_text('order_id,customer_id\n1,100\n')
+    cursor = Psycopg2Cursor() if cursor_api == 'copy_expert' else Psycopg3Cursor()
+    with open(path) as file:
+        crud.copy_from_file(cursor, 'COPY orders_staging FROM STDIN', file, block_size=4)
+
+    assert ''.join(copied) == 'order_id,customer_id\n1,100\n'
+
+
+@pytest.mark.parametrize("dialect, expected", [
+    (sqlite.dialect(), 'ON CONFLICT DO NOTHING'),
+    (postgresql.dialect(), 'ON CONFLICT DO NOTHING'),
+    (mysql.dialect(), 'INSERT IGNORE'),
+    (mssql.dialect(), None),
+])
+def test_insert_ignore_per_dialect(dialect, expected):
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=dialect))
+    sql = str(crud._insert_ignore(db, Order.__table__).compile(dialect=dialect))
+
+    assert sql.startswith('INSERT')
+    if expected:
+        assert expected in sql
+    else:
+        assert 'IGNORE' not in sql and 'CONFLICT' not in sql
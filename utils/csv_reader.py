@@ -0,0 +1,90 @@
+import csv
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pyarrow is optional, fall back to the csv module
+    pa = None
+    pa_csv = None
+
+BLOCK_SIZE = 8 << 20
+BATCH_SIZE = 10_000
+
+
+def read_header(file_path):
+    """
+    Read the column names from the header line of a CSV file.
+
+    Args:
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        list: Column names in file order, empty for an empty file.
+    """
+    # utf-8-sig drops a leading byte order mark, as pyarrow does.
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as file:
+        return next(csv.reader(file), [])
+
+
+def iter_record_batches(file_path, invalid_row_handler=None):
+    """
+    Stream a CSV file as pyarrow record batches with every column typed as a string.
+
+    Requires pyarrow. Empty fields are read as empty strings, as csv.DictReader does.
+    An empty file yields no batches.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        invalid_row_handler (callable, optional): Called with rows that have the wrong
+            number of fields; see pyarrow.csv.ParseOptions. Such rows raise by default.
+
+    Yields:
+        pyarrow.RecordBatch: Consecutive batches of rows.
+    """
+    header = read_header(file_path)
+    if not header:
+        return
+    column_types = {name: pa.string() for name in header}
+    yield from pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=invalid_row_handler),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=False),
+    )
+
+
+def _iter_arrow_batches(file_path):
+    for batch in iter_record_batches(file_path):
+        yield batch.to_pylist()
+
+
+def _iter_dict_reader_batches(file_path, batch_size):
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as file:
+        batch = []
+        for row in csv.DictReader(file):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def iter_csv_batches(file_path, batch_size=BATCH_SIZE):
+    """
+    Stream a CSV file as batches of row dictionaries.
+
+    Uses pyarrow's multithreaded C reader when it is installed, otherwise the
+    standard library csv module. All values are returned as strings.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        batch_size (int, optional): Rows per batch for the csv module reader.
+            The pyarrow reader batches by block size instead.
+
+    Yields:
+        list: Row dictionaries keyed by column name.
+    """
+    if pa_csv is not None:
+        return _iter_arrow_batches(file_path)
+    return _iter_dict_reader_batches(file_path, batch_size)
@@ -1,17 +1,175 @@
-from pydantic import BaseModel, field_validator
+import re
+from typing import Optional
+
+from pydantic import BaseModel, TypeAdapter, ValidationError, field_validator
+
+try:
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional, only needed for split_valid_batch
+    pc = None
+
+INTEGER_PATTERN = r'^[+-]?[0-9]+$'
+# Database integer columns hold signed 64-bit values.
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def parse_integer(v):
+    """Reject values that are not plain signed 64-bit integers before Pydantic converts them."""
+    if v is None:
+        raise ValueError("value is required")
+    if isinstance(v, str):
+        if not re.fullmatch(INTEGER_PATTERN, v):
+            raise ValueError("must be an integer")
+        v = int(v)
+    if isinstance(v, int) and not INT64_MIN <= v <= INT64_MAX:
+        raise ValueError("must fit in a signed 64-bit integer")
+    return v
+
+
+def _is_int64(column):
+    """Vectorized counterpart of parse_integer for a pyarrow string column."""
+    is_integer = pc.match_substring_regex(column, INTEGER_PATTERN)
+    # Compare the magnitude's digits with the int64 limit: fewer digits always fit,
+    # and equal-length digit strings order the same as the numbers they spell.
+    digits = pc.replace_substring_regex(column, r'^[+-]?0*', '')
+    length = pc.utf8_length(digits)
+    limit = pc.if_else(pc.starts_with(column, '-'), str(-INT64_MIN), str(INT64_MAX))
+    limit_digits = len(str(INT64_MAX))
+    in_range = pc.or_(
+        pc.less(length, limit_digits),
+        pc.and_(pc.equal(length, limit_digits), pc.less_equal(digits, limit)),
+    )
+    return pc.and_(is_integer, in_range)
 
 
 class OrderModel(BaseModel):
-    order_id: str
+    order_id: int
     customer_id: str
 
+    @field_validator('order_id', mode='before')
+    def validate_order_id(cls, v):
+        return parse_integer(v)
+
 
 class BarcodeModel(BaseModel):
     barcode: str
-    order_id: str = None
+    order_id: Optional[int] = None
 
     @field_validator('barcode')
-    def validate_order_id(cls, v):
+    def validate_barcode(cls, v):
         if not v:
             raise ValueError("barcode is required")
         return v
+
+    @field_validator('order_id', mode='before')
+    def validate_order_id(cls, v):
+        if v == '':
+            return None  # Treat empty strings as None
+        return parse_integer(v)
+
+
+# Columns that must also be non-empty, mirroring the field validators above.
+NON_EMPTY_FIELDS = {
+    BarcodeModel: ('barcode',),
+}
+
+# Columns holding integers; empty values are allowed when the field is optional.
+INTEGER_FIELDS = {
+    OrderModel: ('order_id',),
+    BarcodeModel: ('order_id',),
+}
+
+
+def invalid_row_indices(rows, model):
+    """
+    Validate row dictionaries one by one against a model.
+
+    Args:
+        rows (list): Rows read from a CSV file.
+        model (pydantic.BaseModel): The Pydantic model for data validation.
+
+    Returns:
+        list: Positions of the invalid rows, including rows with more fields than the header.
+    """
+    validate = TypeAdapter(model).validate_python
+    invalid = []
+    for index, row in enumerate(rows):
+        # csv.DictReader collects fields beyond the header under a None key.
+        if None in row:
+            invalid.append(index)
+            continue
+        try:
+            validate(row)
+        except ValidationError:
+            invalid.append(index)
+    return invalid
+
+
+def split_rows(rows, invalid):
+    """
+    Split rows into valid and invalid ones given the positions of the invalid rows.
+
+    Args:
+        rows (list): Rows read from a CSV file.
+        invalid (list): Positions of the invalid rows.
+
+    Returns:
+        tuple: (valid rows, invalid rows), each a list of dicts.
+    """
+    invalid = set(invalid)
+    valid_rows = [row for index, row in enumerate(rows) if index not in invalid]
+    invalid_rows = [row for index, row in enumerate(rows) if index in invalid]
+    return valid_rows, invalid_rows
+
+
+def split_valid_rows(rows, model):
+    """
+    Validate row dictionaries one by one against a model.
+
+    Args:
+        rows (list): Rows read from a CSV file.
+        model (pydantic.BaseModel): The Pydantic model for data validation.
+
+    Returns:
+        tuple: (valid rows, invalid rows), each a list of dicts.
+    """
+    return split_rows(rows, invalid_row_indices(rows, model))
+
+
+def split_valid_batch(batch, model):
+    """
+    Validate a pyarrow record batch of string columns against a model, column-wise.
+
+    Applies the same rules as validating each row with the model: required fields
+    must be present and not null, NON_EMPTY_FIELDS must not be empty strings and
+    INTEGER_FIELDS must hold signed 64-bit integers.
+
+    Args:
+        batch (pyarrow.RecordBatch): Rows read from a CSV file.
+        model (pydantic.BaseModel): The Pydantic model whose rules to apply.
+
+    Returns:
+        tuple: (valid rows, invalid rows), each a list of dicts.
+    """
+    required = [name for name, field in model.model_fields.items() if field.is_required()]
+    if any(name not in batch.schema.names for name in required):
+        return [], batch.to_pylist()
+
+    mask = None
+    checks = [pc.is_valid(batch[name]) for name in required]
+    checks += [pc.greater(pc.utf8_length(batch[name]), 0) for name in NON_EMPTY_FIELDS.get(model, ())]
+    for name in INTEGER_FIELDS.get(model, ()):
+        if name not in batch.schema.names:
+            continue
+        is_integer = _is_int64(batch[name])
+        if not model.model_fields[name].is_required():
+            is_integer = pc.or_(is_integer, pc.equal(batch[name], ''))
+        checks.append(is_integer)
+    for check in checks:
+        mask = check if mask is None else pc.and_(mask, check)
+    if mask is None:
+        return batch.to_pylist(), []
+
+    mask = pc.fill_null(mask, False)
+    return batch.filter(mask).to_pylist(), batch.filter(pc.invert(mask)).to_pylist()